@@ -0,0 +1,29 @@
+"""
+Gunicorn config for the solver-only profile.
+
+Run from the ``backend`` folder with ``gunicorn -c gunicorn_slim.conf.py``.
+The application and solver are loaded once in the master and shared by the
+forked workers, so adding workers or instances stays cheap.
+"""
+
+import os
+
+wsgi_app = "src.wsgi_slim:application"
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+
+preload_app = True
+
+
+def on_starting(server):
+	from src.startup import warm_up
+
+	warm_up()
+
+
+def post_fork(server, worker):
+	from src.startup import restart_clocks
+
+	restart_clocks()
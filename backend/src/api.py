@@ -1,27 +1,154 @@
-from typing import Any
-from ninja import NinjaAPI, Schema
+import base64
+import binascii
+import zlib
+from django.conf import settings
+from ninja import NinjaAPI, Query, Schema
 from ninja.errors import HttpError
+from pydantic import Field, ValidationError, model_validator
 
-from src.state.board_solver import BoardSolver
+from src.solve_store import SolveStore, StoredSolution
 from src.state.board import Board, Cell, CellState
+from src.state.granularity import Granularity
+from src.state.solve_budget import BudgetExceeded, BudgetKind, SolveBudget
 
 api = NinjaAPI()
 
+# Most steps a single page request may return
+STEPS_PAGE_LIMIT = 100
+# Largest decompressed request a solve id may decode to
+MAX_SOLVE_ID_BYTES = 64 * 1024
+# Most rows or columns a board may have; the frontend allows up to 9
+MAX_BOARD_SIZE = 12
+# First character of the ids of complete and of budget-stopped solves
+COMPLETE_ID_PREFIX = "c"
+PARTIAL_ID_PREFIX = "p"
+
+solve_store = SolveStore(max_entries=512, ttl=15 * 60)
+solve_budget = SolveBudget(**settings.SOLVER_BUDGET)
+
 class SolveRequest(Schema):
-	rows: int
-	cols: int
+	rows: int = Field(ge=1, le=MAX_BOARD_SIZE)
+	cols: int = Field(ge=1, le=MAX_BOARD_SIZE)
 	grid: list[list[Cell]]
+	granularity: Granularity = Granularity.CELL
+
+	@model_validator(mode="after")
+	def check_grid_shape(self) -> "SolveRequest":
+		if len(self.grid) != self.rows or any(len(row) != self.cols for row in self.grid):
+			raise ValueError(f"grid must have {self.rows} rows of {self.cols} cells")
+		return self
 
 class GridState(Schema):
 	grid: list[list[Cell]]
 	state: CellState
 	message: str
+	cells: list[tuple[int, int]]
+	# The queen placed alongside cells in a step folded at queen granularity
+	queen: tuple[int, int] | None = None
 
-@api.post("/solve")
-def solve(request, body: SolveRequest) -> list[GridState]:
+class SolveSummary(Schema):
+	id: str
+	steps: int
+	grid: list[list[Cell]]
+	# False if a solver budget ran out, in which case the steps and grid hold
+	# the deductions made so far and remaining lists each colour's candidates
+	complete: bool = True
+	budget: BudgetKind | None = None
+	remaining: dict[str, list[tuple[int, int]]] = {}
+
+def _encode_solve_id(request_json: str, complete: bool) -> str:
+	"""
+	Encodes a solve request as its solve id.
+
+	The id is the compressed request itself, so any worker can regenerate the
+	steps of a complete solve whose stored copy lives in another worker or has
+	expired. Its first character records whether the solve was complete
+	(COMPLETE_ID_PREFIX) or stopped by a budget (PARTIAL_ID_PREFIX).
+	"""
+	data = zlib.compress(request_json.encode(), 9)
+	prefix = COMPLETE_ID_PREFIX if complete else PARTIAL_ID_PREFIX
+	return prefix + base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+def _decode_solve_id(solve_id: str) -> tuple[SolveRequest, bool] | None:
+	"""
+	Decodes a solve id back into its solve request and whether it was complete.
+
+	Returns None if the id is malformed or decompresses to more than
+	MAX_SOLVE_ID_BYTES.
+	"""
+	prefix, encoded = solve_id[:1], solve_id[1:]
+	if prefix not in (COMPLETE_ID_PREFIX, PARTIAL_ID_PREFIX):
+		return None
+	try:
+		data = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+		decompressor = zlib.decompressobj()
+		raw = decompressor.decompress(data, MAX_SOLVE_ID_BYTES)
+		if decompressor.unconsumed_tail:
+			return None
+		return SolveRequest.model_validate_json(raw), prefix == COMPLETE_ID_PREFIX
+	except (binascii.Error, ValueError, zlib.error, ValidationError):
+		return None
+
+def _solve(body: SolveRequest) -> tuple[SolveSummary, StoredSolution]:
+	"""
+	Solves a request within the configured budget and stores its steps under its solve id.
+
+	Raises:
+		HttpError: 422 if the board has no solution.
+	"""
+	# Imported here so plain imports of the API (URL resolution, management
+	# commands) skip the solver; gunicorn preloads it via src.startup.warm_up
+	from src.state.board_solver import BoardSolver
+
+	# Serialized before solving, as the solver updates the grid's cells in place
+	request_json = body.model_dump_json()
 	board = Board(body.rows, body.cols, body.grid)
-	solution = BoardSolver(board).solve()
+	try:
+		steps = BoardSolver(board, solve_budget, body.granularity).solve()
+	except BudgetExceeded as exc:
+		solution = StoredSolution(board, exc.steps)
+		summary = SolveSummary(
+			id=_encode_solve_id(request_json, complete=False),
+			steps=len(solution),
+			grid=board.grid,
+			complete=False,
+			budget=exc.budget,
+			remaining=exc.remaining,
+		)
+	else:
+		if steps is None:
+			raise HttpError(422, "This board has no solution. Not every colour region has a valid queen placement.")
+		solution = StoredSolution(board, steps)
+		summary = SolveSummary(id=_encode_solve_id(request_json, complete=True), steps=len(solution), grid=board.grid)
+	solve_store.put(summary.id, solution)
+	return summary, solution
+
+@api.post("/solve")
+def solve(request, body: SolveRequest) -> SolveSummary:
+	return _solve(body)[0]
+
+@api.get("/solve/{solve_id}/steps")
+def solve_steps(
+	request,
+	solve_id: str,
+	start: int = Query(0, alias="from", ge=0),
+	end: int | None = Query(None, alias="to", ge=0),
+) -> list[GridState]:
+	solution = solve_store.get(solve_id)
 	if solution is None:
-		raise HttpError(422, "This board has no solution. Not every colour region has a valid queen placement.")
-	return [GridState(grid=step[0], state=step[1], message=step[2]) for step in solution]
-	
\ No newline at end of file
+		decoded = _decode_solve_id(solve_id)
+		if decoded is None:
+			raise HttpError(404, "Unknown solve id.")
+		body, complete = decoded
+		# Where a partial solve stops depends on wall time, so re-solving it
+		# could serve steps that no longer match its summary
+		if not complete:
+			raise HttpError(410, "These solution steps have expired. Please solve the board again.")
+		summary, solution = _solve(body)
+		if not summary.complete:
+			raise HttpError(410, "These solution steps have expired. Please solve the board again.")
+	end = start + STEPS_PAGE_LIMIT if end is None else min(end, start + STEPS_PAGE_LIMIT)
+	return [
+		GridState(grid=step[0], state=step[1], message=step[2], cells=step[3], queen=step[4])
+		for step in solution.page(start, end)
+	]
@@ -0,0 +1,22 @@
+"""
+Solver-only ASGI config for src project.
+
+Like ``src.asgi`` but defaults to the ``src.settings_slim`` profile, which
+mounts only the Ninja API and CORS. Reports its import time and the time to
+its first response on stderr.
+"""
+
+import os
+import time
+
+_started = time.perf_counter()
+
+from django.core.asgi import get_asgi_application
+
+from src.startup import AsgiFirstResponseTimer, elapsed_ms, report
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'src.settings_slim')
+
+application = AsgiFirstResponseTimer(get_asgi_application(), _started)
+
+report(f"src.asgi_slim imported in {elapsed_ms(_started):.1f} ms")
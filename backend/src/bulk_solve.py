@@ -0,0 +1,375 @@
+"""
+Offline bulk solver for JSONL board corpora.
+
+Each input line is a board in the same shape as the body of ``/api/solve``
+(``rows``, ``cols`` and ``grid``, plus an optional ``id``). Boards are solved
+across a pool of processes and one JSON result per input line is written in
+input order, so a re-solve of the whole puzzle archive never goes through
+the HTTP API.
+
+Usage (from the ``backend`` folder):
+
+	python -m src.bulk_solve boards.jsonl -o results.jsonl -j 8 --checkpoint results.ckpt
+	cat boards.jsonl | python -m src.bulk_solve --answer-only > answers.jsonl
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator
+
+from src.state.board import Board, Cell, CellState
+from src.state.board_solver import BoardSolver
+from src.state.granularity import Granularity
+from src.state.solve_budget import BudgetExceeded, SolveBudget
+
+# (line number, raw line) as read from the input
+Item = tuple[int, str]
+# (line number, status, board id, seconds, JSON record or None for blank lines)
+Result = tuple[int, str, str | None, float, str | None]
+# Progress saved in a checkpoint: lines processed, output size, status counts
+# and the slowest boards as a min-heap of (seconds, line number, board id)
+Progress = tuple[int, int, dict[str, int], list[tuple[float, int, str | None]]]
+# Options saved in a checkpoint, which a resumed run must match
+RunOptions = dict[str, str | bool | float | int | None]
+
+STATUSES = ("solved", "unsolvable", "budget", "failed")
+
+
+def _parse_board(data: dict) -> Board:
+	"""
+	Builds a board from a decoded JSONL record.
+
+	Parameters:
+		data (dict): The decoded record, with ``rows``, ``cols`` and ``grid``.
+
+	Returns:
+		Board: The board described by the record.
+	"""
+	grid = [[Cell(cell["colour"], cell["state"]) for cell in row] for row in data["grid"]]
+	return Board(data["rows"], data["cols"], grid)
+
+
+def _serialize_grid(grid: list[list[Cell]]) -> list[list[dict[str, str]]]:
+	return [[{"colour": cell.colour, "state": cell.state.value} for cell in row] for row in grid]
+
+
+def _serialize_steps(steps: list[tuple[list[list[Cell]], CellState, str, list[tuple[int, int]], tuple[int, int] | None]]) -> list[dict]:
+	return [
+		{"grid": _serialize_grid(step[0]), "state": step[1].value, "message": step[2], "cells": step[3], "queen": step[4]}
+		for step in steps
+	]
+
+
+def _solve_line(item: Item, answer_only: bool, budget: SolveBudget, granularity: Granularity) -> Result:
+	"""
+	Solves the board on a single input line.
+
+	Failures of any kind (invalid JSON, malformed boards, solver errors) are
+	reported in the result rather than raised, so one bad board never stops
+	a bulk run.
+
+	Parameters:
+		item (Item): The line number and raw line.
+		answer_only (bool): Whether to omit the solution steps from the record.
+		budget (SolveBudget): The limits each solve runs under.
+		granularity (Granularity): How finely the steps are recorded.
+
+	Returns:
+		Result: The line number, status, board id, solve time and JSON record.
+		The status is one of solved, unsolvable, budget or failed.
+	"""
+	line_number, line = item
+	if not line.strip():
+		return line_number, "blank", None, 0.0, None
+	record: dict = {"line": line_number}
+	board_id = None
+	started = time.perf_counter()
+	try:
+		data = json.loads(line)
+		board_id = data.get("id")
+		if board_id is not None:
+			record["id"] = board_id
+		solver = BoardSolver(_parse_board(data), budget, granularity)
+		solution = solver.solve()
+		if solution is None:
+			record["status"] = "unsolvable"
+		else:
+			record["status"] = "solved"
+			record["queens"] = [
+				[row, col]
+				for row in range(solver.board.rows)
+				for col in range(solver.board.cols)
+				if solver.board.grid[row][col].state == CellState.QUEEN
+			]
+			if not answer_only:
+				record["steps"] = _serialize_steps(solution)
+	except BudgetExceeded as exc:
+		record["status"] = "budget"
+		record["budget"] = exc.budget.value
+		record["remaining"] = exc.remaining
+		if not answer_only:
+			record["steps"] = _serialize_steps(exc.steps)
+	except Exception as exc:
+		record["status"] = "failed"
+		record["error"] = f"{type(exc).__name__}: {exc}"
+	seconds = time.perf_counter() - started
+	record["seconds"] = round(seconds, 6)
+	return line_number, record["status"], board_id, seconds, json.dumps(record, separators=(",", ":"))
+
+
+def _solve_batch(
+	batch: list[Item],
+	answer_only: bool,
+	budget: SolveBudget,
+	granularity: Granularity
+) -> list[Result]:
+	return [_solve_line(item, answer_only, budget, granularity) for item in batch]
+
+
+def _batched(items: Iterable[Item], size: int) -> Iterator[list[Item]]:
+	iterator = iter(items)
+	while batch := list(islice(iterator, size)):
+		yield batch
+
+
+def _solve_batches(
+	batches: Iterator[list[Item]],
+	processes: int,
+	answer_only: bool,
+	budget: SolveBudget,
+	granularity: Granularity
+) -> Iterator[list[Result]]:
+	"""
+	Solves batches across a process pool and yields their results in input order.
+
+	At most two batches per process are in flight at once, so memory stays
+	bounded no matter how large the input is.
+
+	Parameters:
+		batches (Iterator[list[Item]]): The batches of input lines.
+		processes (int): The number of worker processes.
+		answer_only (bool): Whether to omit the solution steps from the records.
+		budget (SolveBudget): The limits each solve runs under.
+		granularity (Granularity): How finely the steps are recorded.
+
+	Yields:
+		list[Result]: The results of each batch, in input order.
+	"""
+	if processes == 1:
+		for batch in batches:
+			yield _solve_batch(batch, answer_only, budget, granularity)
+		return
+	with ProcessPoolExecutor(max_workers=processes) as pool:
+		in_flight = deque()
+		for batch in batches:
+			in_flight.append(pool.submit(_solve_batch, batch, answer_only, budget, granularity))
+			if len(in_flight) >= processes * 2:
+				yield in_flight.popleft().result()
+		while in_flight:
+			yield in_flight.popleft().result()
+
+
+def _run_options(args: argparse.Namespace) -> RunOptions:
+	"""
+	Returns the input and the options that shape the output records, which
+	must stay the same across a resumed run.
+
+	Parameters:
+		args (argparse.Namespace): The parsed command-line arguments.
+
+	Returns:
+		RunOptions: The input path and the record options.
+	"""
+	return {
+		"input": args.input if args.input == "-" else os.path.abspath(args.input),
+		"answer_only": args.answer_only,
+		"granularity": args.granularity.value,
+		"max_seconds": args.max_seconds,
+		"max_probes": args.max_probes,
+		"max_depth": args.max_depth,
+	}
+
+
+def _read_checkpoint(path: str | None) -> tuple[RunOptions | None, Progress]:
+	"""
+	Reads a checkpoint written by ``_write_checkpoint``.
+
+	Parameters:
+		path (str | None): The checkpoint path, or None if not checkpointing.
+
+	Returns:
+		tuple[RunOptions | None, Progress]: The options of the checkpointed
+		run, and the number of input lines already processed, the size of the
+		output file at that point, and the status counts and slowest boards of
+		those lines. The options are None and the progress empty if there is
+		no checkpoint yet.
+	"""
+	counts = dict.fromkeys(STATUSES, 0)
+	if path is None or not os.path.exists(path):
+		return None, (0, 0, counts, [])
+	with open(path) as f:
+		checkpoint = json.load(f)
+	counts.update(checkpoint["counts"])
+	slowest = [tuple(entry) for entry in checkpoint["slowest"]]
+	heapq.heapify(slowest)
+	# Checkpoints from before options were recorded match no run
+	options = checkpoint.get("options", {})
+	return options, (checkpoint["lines"], checkpoint["offset"], counts, slowest)
+
+
+def _write_checkpoint(path: str, options: RunOptions, progress: Progress) -> None:
+	"""
+	Atomically records the run's options, how many input lines have been
+	processed, how many bytes of output they produced, and their status
+	counts and slowest boards, so a resumed run can check it continues the
+	same run and report on the whole corpus.
+
+	Parameters:
+		path (str): The checkpoint path.
+		options (RunOptions): The options of the run.
+		progress (Progress): The progress to record.
+
+	Returns:
+		None
+	"""
+	lines, offset, counts, slowest = progress
+	tmp_path = f"{path}.tmp"
+	with open(tmp_path, "w") as f:
+		json.dump({"options": options, "lines": lines, "offset": offset, "counts": counts, "slowest": slowest}, f)
+	os.replace(tmp_path, path)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+	parser = argparse.ArgumentParser(
+		prog="python -m src.bulk_solve",
+		description="Solve a JSONL corpus of boards across multiple processes.",
+	)
+	parser.add_argument("input", nargs="?", default="-", help="JSONL file of boards, or - for stdin (default)")
+	parser.add_argument("-o", "--output", help="file to write JSONL results to (default: stdout)")
+	parser.add_argument("-j", "--processes", type=int, default=os.cpu_count() or 1, help="number of worker processes (default: CPU count)")
+	parser.add_argument("--batch-size", type=int, default=16, help="boards sent to a worker at a time (default: 16)")
+	parser.add_argument("--answer-only", action="store_true", help="write only the queen positions, not the solution steps")
+	parser.add_argument(
+		"--granularity",
+		type=Granularity,
+		choices=[granularity.value for granularity in Granularity],
+		default=Granularity.CELL,
+		help="record a step per cell, rule or queen (default: cell)",
+	)
+	parser.add_argument("--checkpoint", help="checkpoint file; an existing one resumes the run (requires --output)")
+	parser.add_argument("--checkpoint-every", type=int, default=1000, help="input lines between checkpoints (default: 1000)")
+	parser.add_argument("--max-seconds", type=float, help="wall time budget per board, in seconds (default: unlimited)")
+	parser.add_argument("--max-probes", type=int, help="backtracking probe budget per board (default: unlimited)")
+	parser.add_argument("--max-depth", type=int, help="nested probe depth budget per board (default: unlimited)")
+	parser.add_argument("--slowest", type=int, default=5, help="number of slowest boards to list in the summary (default: 5)")
+	return parser
+
+
+def _parse_args(parser: argparse.ArgumentParser, argv: list[str] | None) -> argparse.Namespace:
+	args = parser.parse_args(argv)
+	if args.checkpoint and not args.output:
+		parser.error("--checkpoint requires --output")
+	if args.processes < 1 or args.batch_size < 1 or args.checkpoint_every < 1:
+		parser.error("--processes, --batch-size and --checkpoint-every must be positive")
+	return args
+
+
+def main(argv: list[str] | None = None) -> int:
+	"""
+	Runs the bulk solver and prints a summary to stderr.
+
+	Parameters:
+		argv (list[str] | None): The command-line arguments, defaulting to ``sys.argv``.
+
+	Returns:
+		int: The exit status, 1 if any board failed and 0 otherwise. When
+		resuming, boards from before the checkpoint count too.
+	"""
+	parser = _build_parser()
+	args = _parse_args(parser, argv)
+	budget = SolveBudget(max_seconds=args.max_seconds, max_probes=args.max_probes, max_depth=args.max_depth)
+
+	options = _run_options(args)
+	checkpoint_options, (skip_lines, offset, counts, slowest) = _read_checkpoint(args.checkpoint)
+	if checkpoint_options is not None and checkpoint_options != options:
+		changed = ", ".join(
+			f"{name} was {checkpoint_options.get(name)!r}, now {value!r}"
+			for name, value in options.items()
+			if checkpoint_options.get(name) != value
+		)
+		parser.error(f"--checkpoint {args.checkpoint} is from a run with different options ({changed}); rerun with the same options or a new checkpoint")
+	if args.output is None:
+		output = sys.stdout.buffer
+	elif skip_lines:
+		output = open(args.output, "r+b")
+		output.truncate(offset)
+		output.seek(offset)
+	else:
+		output = open(args.output, "wb")
+	source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+
+	processed = 0
+	lines_done = skip_lines
+	since_checkpoint = 0
+	started = time.perf_counter()
+	try:
+		items = islice(enumerate(source, start=1), skip_lines, None)
+		batches = _batched(items, args.batch_size)
+		for results in _solve_batches(batches, args.processes, args.answer_only, budget, args.granularity):
+			for line_number, status, board_id, seconds, record in results:
+				lines_done = line_number
+				if record is None:
+					continue
+				output.write(record.encode() + b"\n")
+				processed += 1
+				counts[status] += 1
+				if len(slowest) < args.slowest:
+					heapq.heappush(slowest, (seconds, line_number, board_id))
+				elif slowest and seconds > slowest[0][0]:
+					heapq.heapreplace(slowest, (seconds, line_number, board_id))
+			since_checkpoint += len(results)
+			if args.checkpoint and since_checkpoint >= args.checkpoint_every:
+				output.flush()
+				_write_checkpoint(args.checkpoint, options, (lines_done, output.tell(), counts, slowest))
+				since_checkpoint = 0
+		output.flush()
+		if args.checkpoint:
+			_write_checkpoint(args.checkpoint, options, (lines_done, output.tell(), counts, slowest))
+	finally:
+		if source is not sys.stdin:
+			source.close()
+		if output is not sys.stdout.buffer:
+			output.close()
+
+	elapsed = time.perf_counter() - started
+	throughput = processed / elapsed if elapsed else 0.0
+	resumed = f" (resumed after line {skip_lines})" if skip_lines else ""
+	print(
+		f"Processed {processed} boards in {elapsed:.2f} s ({throughput:.1f} boards/s) "
+		f"with {args.processes} process(es){resumed}",
+		file=sys.stderr,
+	)
+	if skip_lines:
+		print(f"Totals below include the {sum(counts.values()) - processed} boards before the checkpoint", file=sys.stderr)
+	print(
+		f"Solved: {counts['solved']}, unsolvable: {counts['unsolvable']}, "
+		f"budget exceeded: {counts['budget']}, failed: {counts['failed']}",
+		file=sys.stderr,
+	)
+	if slowest:
+		print("Slowest boards:", file=sys.stderr)
+		for seconds, line_number, board_id in sorted(slowest, reverse=True):
+			label = f" ({board_id})" if board_id is not None else ""
+			print(f"  line {line_number}{label}: {seconds:.3f} s", file=sys.stderr)
+	return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -142,4 +142,13 @@ CSRF_TRUSTED_ORIGINS = [
 	"https://queens-master-solver-hj046ezrq-ishaan-sainis-projects.vercel.app",
 	"https://queens-master-solver-git-dev-ishaan-sainis-projects.vercel.app",
 	"https://queens.ishaansaini.dev",
-]
\ No newline at end of file
+]
+
+# Solver budgets for /api/solve (see src.state.solve_budget.SolveBudget).
+# max_depth must be at least src.api.MAX_BOARD_SIZE, or valid boards stop early
+
+SOLVER_BUDGET = {
+	'max_seconds': 5.0,
+	'max_probes': 2000,
+	'max_depth': 12,
+}
@@ -0,0 +1,52 @@
+"""
+Solver-only Django settings for src project.
+
+Serves nothing but the Ninja API behind CORS: no admin, auth, sessions,
+messages or database. Hosts, origins, the secret key and the
+solver budgets are shared with the full profile in ``src.settings``.
+
+Select it with ``DJANGO_SETTINGS_MODULE=src.settings_slim`` or use the
+``src.asgi_slim`` / ``src.wsgi_slim`` entry points, which do so by default.
+"""
+
+from .settings import (
+	ALLOWED_HOSTS,
+	BASE_DIR,
+	CORS_ALLOW_CREDENTIALS,
+	CORS_ALLOWED_ORIGINS,
+	DEBUG,
+	SECRET_KEY,
+	SOLVER_BUDGET,
+)
+
+INSTALLED_APPS = [
+	'corsheaders',
+]
+
+MIDDLEWARE = [
+	'corsheaders.middleware.CorsMiddleware',
+	'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'src.urls_slim'
+
+# A bare template engine, needed only to render the API docs at /api/docs
+TEMPLATES = [
+	{
+		'BACKEND': 'django.template.backends.django.DjangoTemplates',
+		'DIRS': [],
+		'APP_DIRS': False,
+	},
+]
+
+WSGI_APPLICATION = 'src.wsgi_slim.application'
+
+# The solver is stateless, so no database is configured.
+DATABASES = {}
+
+# Skip loading translation catalogues; every response is English JSON.
+USE_I18N = False
+
+USE_TZ = True
+
+TIME_ZONE = 'UTC'
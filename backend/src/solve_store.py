@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+
+from src.state.board import Board, Cell, CellState
+
+_STATE_CODES = {CellState.EMPTY: "e", CellState.QUEEN: "q", CellState.MARKED: "m"}
+_CODE_STATES = {code: state for state, code in _STATE_CODES.items()}
+
+class StoredSolution:
+	"""
+	A compact copy of a solver's steps.
+
+	Every step of a solve shares the same colours, so they are kept once and
+	each step only stores its cell states as a string. This keeps a stored
+	solve to a few kilobytes instead of one ``Cell`` per cell per step.
+	"""
+	colours: list[list[str]]
+	steps: list[tuple[str, CellState, str, list[tuple[int, int]], tuple[int, int] | None]] # list(cell states, state, reason, cells, queen)
+
+	def __init__(
+		self,
+		board: Board,
+		steps: list[tuple[list[list[Cell]], CellState, str, list[tuple[int, int]], tuple[int, int] | None]]
+	) -> None:
+		"""
+		Compacts the steps returned by ``BoardSolver.solve``.
+
+		Parameters:
+			board (Board): The solved board, whose colours every step shares.
+			steps (list): The solution steps.
+
+		Returns:
+			None
+		"""
+		self.colours = [[cell.colour for cell in row] for row in board.grid]
+		self.steps = [
+			("".join(_STATE_CODES[cell.state] for row in grid for cell in row), state, message, cells, queen)
+			for grid, state, message, cells, queen in steps
+		]
+
+	def __len__(self) -> int:
+		return len(self.steps)
+
+	def grid(self, index: int) -> list[list[Cell]]:
+		"""
+		Rebuilds the grid of the step at the given index.
+
+		Parameters:
+			index (int): The index of the step.
+
+		Returns:
+			list[list[Cell]]: The grid after that step.
+		"""
+		codes = iter(self.steps[index][0])
+		return [[Cell(colour, _CODE_STATES[next(codes)]) for colour in row] for row in self.colours]
+
+	def page(self, start: int, end: int) -> list[tuple[list[list[Cell]], CellState, str, list[tuple[int, int]], tuple[int, int] | None]]:
+		"""
+		Rebuilds the steps in the half-open range [start, end).
+
+		Parameters:
+			start (int): The index of the first step.
+			end (int): The index after the last step.
+
+		Returns:
+			list: The steps in the same shape ``BoardSolver.solve`` returns them.
+		"""
+		return [(self.grid(i), *self.steps[i][1:]) for i in range(start, min(end, len(self)))]
+
+class SolveStore:
+	"""
+	A bounded, thread-safe, in-memory store of solutions keyed by solve id.
+
+	Entries expire ``ttl`` seconds after they were last stored or read, and
+	the least recently used entry is evicted once ``max_entries`` is reached.
+	"""
+	max_entries: int
+	ttl: float
+	_entries: OrderedDict[str, tuple[float, StoredSolution]] # id -> (expiry, solution)
+
+	def __init__(self, max_entries: int, ttl: float) -> None:
+		self.max_entries = max_entries
+		self.ttl = ttl
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()
+
+	def _evict_expired(self, now: float) -> None:
+		# Entries are kept in expiry order, so only the oldest ones need checking
+		while self._entries:
+			solve_id, (expiry, _) = next(iter(self._entries.items()))
+			if expiry > now:
+				break
+			del self._entries[solve_id]
+
+	def get(self, solve_id: str) -> StoredSolution | None:
+		"""
+		Returns the solution stored under a solve id and refreshes its expiry.
+
+		Parameters:
+			solve_id (str): The solve id.
+
+		Returns:
+			StoredSolution | None: The solution, or None if it is unknown or expired.
+		"""
+		now = time.monotonic()
+		with self._lock:
+			self._evict_expired(now)
+			entry = self._entries.get(solve_id)
+			if entry is None:
+				return None
+			self._entries[solve_id] = (now + self.ttl, entry[1])
+			self._entries.move_to_end(solve_id)
+			return entry[1]
+
+	def put(self, solve_id: str, solution: StoredSolution) -> None:
+		"""
+		Stores a solution under a solve id, evicting old entries if needed.
+
+		Parameters:
+			solve_id (str): The solve id.
+			solution (StoredSolution): The solution to store.
+
+		Returns:
+			None
+		"""
+		now = time.monotonic()
+		with self._lock:
+			self._evict_expired(now)
+			self._entries[solve_id] = (now + self.ttl, solution)
+			self._entries.move_to_end(solve_id)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
@@ -0,0 +1,134 @@
+"""
+Startup helpers for the solver-only entry points (``src.asgi_slim`` and
+``src.wsgi_slim``).
+
+They report how long the entry point took to import and how long each
+worker took to send its first response, so cold starts can be tracked on
+autoscaled instances.
+"""
+
+import sys
+import time
+
+
+def report(message: str) -> None:
+	"""
+	Writes a startup timing line to stderr, which gunicorn and Render both
+	collect alongside the server log.
+
+	Parameters:
+		message (str): The message to write.
+
+	Returns:
+		None
+	"""
+	print(f"[startup] {message}", file=sys.stderr, flush=True)
+
+
+def elapsed_ms(started: float) -> float:
+	"""
+	Returns the milliseconds elapsed since a ``time.perf_counter()`` reading.
+
+	Parameters:
+		started (float): The earlier ``time.perf_counter()`` reading.
+
+	Returns:
+		float: The elapsed time in milliseconds.
+	"""
+	return (time.perf_counter() - started) * 1000
+
+
+def warm_up() -> None:
+	"""
+	Resolves the URLconf and imports the solver, which ``src.api`` loads
+	lazily, so they are imported immediately instead of on the first request.
+
+	Called from the gunicorn master (see ``gunicorn_slim.conf.py``) so that
+	forked workers start with every module already loaded.
+
+	Returns:
+		None
+	"""
+	from django.urls import get_resolver
+
+	started = time.perf_counter()
+	get_resolver().url_patterns
+	import src.state.board_solver  # noqa: F401
+	report(f"API and solver preloaded in {elapsed_ms(started):.1f} ms")
+
+
+def restart_clocks() -> None:
+	"""
+	Restarts every first-response timer in this process from now.
+
+	With ``preload_app`` the entry point is imported by the gunicorn master,
+	long before any worker sees traffic, so ``gunicorn_slim.conf.py`` calls
+	this after each fork to measure the worker's own cold start instead.
+
+	Returns:
+		None
+	"""
+	now = time.perf_counter()
+	for timer in _FirstResponseTimer.instances:
+		timer.started = now
+		timer.since = "worker start"
+
+
+class _FirstResponseTimer:
+	"""
+	Reports the time to the first response an application sends, both since
+	the clock started and since that request arrived. The clock starts when
+	the entry point starts importing, or at worker start once
+	``restart_clocks`` has been called.
+	"""
+	instances: list["_FirstResponseTimer"] = []
+
+	def __init__(self, app, started: float) -> None:
+		self.app = app
+		self.started = started
+		self.since = "import"
+		self.reported = False
+		_FirstResponseTimer.instances.append(self)
+
+	def _report(self, request_started: float) -> None:
+		self.reported = True
+		report(
+			f"First response {elapsed_ms(self.started):.1f} ms after {self.since} "
+			f"({elapsed_ms(request_started):.1f} ms handling the request)"
+		)
+
+
+class AsgiFirstResponseTimer(_FirstResponseTimer):
+	"""
+	Times the first HTTP response sent by an ASGI application.
+	"""
+
+	async def __call__(self, scope, receive, send):
+		if self.reported or scope["type"] != "http":
+			return await self.app(scope, receive, send)
+		request_started = time.perf_counter()
+
+		async def timed_send(message):
+			if message["type"] == "http.response.start" and not self.reported:
+				self._report(request_started)
+			await send(message)
+
+		return await self.app(scope, receive, timed_send)
+
+
+class WsgiFirstResponseTimer(_FirstResponseTimer):
+	"""
+	Times the first response started by a WSGI application.
+	"""
+
+	def __call__(self, environ, start_response):
+		if self.reported:
+			return self.app(environ, start_response)
+		request_started = time.perf_counter()
+
+		def timed_start_response(status, headers, exc_info=None):
+			if not self.reported:
+				self._report(request_started)
+			return start_response(status, headers, exc_info)
+
+		return self.app(environ, timed_start_response)
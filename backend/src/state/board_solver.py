@@ -1,14 +1,37 @@
+import time
 from src.state.board import Board, Cell, CellState
 from src.state.axis import Axis
+from src.state.granularity import Granularity
+from src.state.solve_budget import BudgetExceeded, BudgetKind, SolveBudget
+
+class _BudgetHit(Exception):
+	"""
+	Unwinds the solver when a budget runs out. Deliberately not a ValueError,
+	so probes do not mistake it for a conflict.
+	"""
+	def __init__(self, budget: BudgetKind) -> None:
+		super().__init__(budget)
+		self.budget = budget
 
 class BoardSolver:
 	board: Board
 	unmarked_colour_dict: dict[str, list[tuple[int, int]]] # list(row, col)
 	colours_queen_dict: dict[str, bool]
 	colours_to_rc: dict[str, tuple[dict[int, int], dict[int, int]]]
-	solution_steps: list[tuple[list[list[Cell]], CellState, str]] # list(row, col, state, reason)
+	solution_steps: list[tuple[list[list[Cell]], CellState, str, list[tuple[int, int]], tuple[int, int] | None]] # list(grid, state, reason, cells, queen)
+	granularity: Granularity
+	_pending_step: tuple[CellState, str, list[tuple[int, int]], tuple[int, int] | None] | None # (state, reason, cells, queen)
+	budget: SolveBudget
+	probes: int
+	depth: int
+	_deadline: float | None
 
-	def __init__(self, board: Board) -> None:
+	def __init__(
+		self,
+		board: Board,
+		budget: SolveBudget | None = None,
+		granularity: Granularity = Granularity.CELL
+	) -> None:
 		"""
 		Initializes the board solver with a given board.
 		
@@ -20,15 +43,23 @@ class BoardSolver:
 		
 		Parameters:
 			board (Board): The board to solve.
+			budget (SolveBudget | None): Limits on the work the solve may do. Unbounded if None.
+			granularity (Granularity): How finely deductions are recorded as steps.
 		
 		Returns:
 			None
 		"""
 		self.board = board
+		self.budget = budget or SolveBudget()
+		self.probes = 0
+		self.depth = 0
+		self._deadline = None
 		self.unmarked_colour_dict = {}
 		self.colours_queen_dict = {}
 		self.colours_to_rc = {}
 		self.solution_steps = []
+		self.granularity = granularity
+		self._pending_step = None
 		for row in range(self.board.rows):
 			for col in range(self.board.cols):
 				cell = self.board.grid[row][col]
@@ -147,6 +178,81 @@ class BoardSolver:
 		except ValueError:
 			pass
 
+	def _record_step(self, state: CellState, reason: str, row: int, col: int, group_reason: str | None = None):
+		"""
+		Records that the cell at (row, col) was set to the given state.
+
+		At cell granularity this appends a step straight away. Otherwise the
+		cell joins the pending step, which is appended by _flush_steps.
+
+		Every cell of a step is set to the step's state. At queen granularity,
+		a cell marked while the pending step holds a lone queen folds that
+		queen into the step's queen, and the step becomes a marked step.
+
+		Parameters:
+			state (CellState): The state the cell was set to.
+			reason (str): Why the cell was set, as shown for a single cell.
+			row (int): The row of the cell.
+			col (int): The column of the cell.
+			group_reason (str | None): The reason shown when the cell starts a
+				grouped step, if it differs from reason.
+		"""
+		if self.granularity == Granularity.CELL:
+			self.solution_steps.append((self.board.clone().grid, state, reason, [(row, col)], None))
+		elif self._pending_step is None:
+			self._pending_step = (state, group_reason or reason, [(row, col)], None)
+		elif self._pending_step[0] == state:
+			self._pending_step[2].append((row, col))
+		elif self._pending_step[0] == CellState.QUEEN and self.granularity == Granularity.QUEEN:
+			# The placement's reason is kept, so the step explains why the queen went there
+			queen_reason, (queen,) = self._pending_step[1], self._pending_step[2]
+			self._pending_step = (state, queen_reason, [(row, col)], queen)
+		else:
+			self._flush_steps()
+			self._pending_step = (state, group_reason or reason, [(row, col)], None)
+		# Checked after recording, so a cell already marked is never left out of the steps
+		self._check_deadline()
+
+	def _flush_steps(self, boundary: Granularity | None = None):
+		"""
+		Appends the pending step, if any, as a single step.
+
+		Parameters:
+			boundary (Granularity | None): What just finished. RULE ends a rule
+				that may belong to a queen placement, so it only flushes at
+				rule granularity. QUEEN ends a queen placement and None ends
+				anything else, and both always flush.
+		"""
+		if self._pending_step is None:
+			return
+		if boundary == Granularity.RULE and self.granularity != Granularity.RULE:
+			return
+		state, reason, cells, queen = self._pending_step
+		self._pending_step = None
+		if queen is not None:
+			reason = f"{reason}, ruling out {len(cells)} {'cell' if len(cells) == 1 else 'cells'}"
+		self.solution_steps.append((self.board.clone().grid, state, reason, cells, queen))
+
+	def _queen_group_reason(self, rule_reason: str, row: int, col: int) -> str:
+		"""
+		Returns the reason for a grouped step of cells ruled out by the queen on (row, col).
+
+		At queen granularity the rules around a queen share one step, so the
+		reason names the placement rather than whichever rule fired first.
+		Steps that also place the queen take the placement's reason instead.
+
+		Parameters:
+			rule_reason (str): The reason for a step of one rule's cells.
+			row (int): The row of the queen.
+			col (int): The column of the queen.
+
+		Returns:
+			str: The reason to give the grouped step.
+		"""
+		if self.granularity == Granularity.QUEEN:
+			return f"Cells ruled out by the Queen on ({row}, {col})"
+		return rule_reason
+
 	def _mark_cells_in_same_row(self, row: int, col: int):
 		"""
 		Marks all unmarked cells in the same row as marked.
@@ -156,11 +262,13 @@ class BoardSolver:
 		for other_col in range(self.board.cols):
 			if col != other_col and self._check_cell_empty(row, other_col):
 				self._mark_cell_as_marked(row, other_col)
-				self.solution_steps.append((
-					self.board.clone().grid,
+				self._record_step(
 					CellState.MARKED,
-					f"Cell in the same row as the Queen on ({row}, {col})"
-				))
+					f"Cell in the same row as the Queen on ({row}, {col})",
+					row, other_col,
+					self._queen_group_reason(f"Cells in the same row as the Queen on ({row}, {col})", row, col)
+				)
+		self._flush_steps(Granularity.RULE)
 	
 	def _mark_cells_in_same_column(self, row: int, col: int):
 		"""
@@ -171,11 +279,13 @@ class BoardSolver:
 		for other_row in range(self.board.rows):
 			if row != other_row and self._check_cell_empty(other_row, col):
 				self._mark_cell_as_marked(other_row, col)
-				self.solution_steps.append((
-					self.board.clone().grid,
+				self._record_step(
 					CellState.MARKED,
-					f"Cell in the same column as the Queen on ({row}, {col})"
-				))
+					f"Cell in the same column as the Queen on ({row}, {col})",
+					other_row, col,
+					self._queen_group_reason(f"Cells in the same column as the Queen on ({row}, {col})", row, col)
+				)
+		self._flush_steps(Granularity.RULE)
 
 	def _mark_cells_surrounding_cell(self, row: int, col: int):
 		"""
@@ -187,34 +297,40 @@ class BoardSolver:
 			for c in range(max(0, col - 1), min(self.board.cols, col + 2)):
 				if self._check_cell_empty(r, c):
 					self._mark_cell_as_marked(r, c)
-					self.solution_steps.append((
-						self.board.clone().grid,
+					self._record_step(
 						CellState.MARKED,
-						f"Cell adjacent to the queen on ({row}, {col})"
-					))
+						f"Cell adjacent to the queen on ({row}, {col})",
+						r, c,
+						self._queen_group_reason(f"Cells adjacent to the queen on ({row}, {col})", row, col)
+					)
+		self._flush_steps(Granularity.RULE)
 	
-	def _mark_cells_of_same_colour(self, colour: str):
+	def _mark_cells_of_same_colour(self, row: int, col: int):
 		"""
-		Marks all unmarked cells of the same colour as marked.
+		Marks all unmarked cells of the same colour as the queen on (row, col) as marked.
 		
 		This function marks all cells that are unmarked and have the same colour
 		as marked. The function does not mark any cells that are not empty or
 		are already marked.
 		
 		Parameters:
-			colour (str): The colour of the cells to mark.
+			row (int): The row of the queen.
+			col (int): The column of the queen.
 		
 		Returns:
 			None
 		"""
-		for (row, col) in list(self.unmarked_colour_dict[colour]):
-			if self._check_cell_empty(row, col):
-				self._mark_cell_as_marked(row, col)
-				self.solution_steps.append((
-					self.board.clone().grid,
+		colour = self.board.grid[row][col].colour
+		for (r, c) in list(self.unmarked_colour_dict[colour]):
+			if self._check_cell_empty(r, c):
+				self._mark_cell_as_marked(r, c)
+				self._record_step(
 					CellState.MARKED,
-					f"Cell of the same colour as the queen on ({row}, {col})"
-				))
+					f"Cell of the same colour as the queen on ({r}, {c})",
+					r, c,
+					self._queen_group_reason(f"Remaining {colour} cells, as that colour already has a queen", row, col)
+				)
+		self._flush_steps(Granularity.RULE)
 
 	def _mark_cells_around_queen(self, row: int, col: int):
 		"""
@@ -236,7 +352,9 @@ class BoardSolver:
 		self._mark_cells_surrounding_cell(row, col)
 
 		# Mark all unmarked cells that have the same colour
-		self._mark_cells_of_same_colour(self.board.grid[row][col].colour)
+		self._mark_cells_of_same_colour(row, col)
+
+		self._flush_steps(Granularity.QUEEN)
 	
 	def _check_queens(self):
 		"""
@@ -257,11 +375,8 @@ class BoardSolver:
 			if len(self.unmarked_colour_dict[colour]) == 1:
 				(row, col) = self.unmarked_colour_dict[colour][0]
 				self._mark_cell_as_queen(row, col)
-				self.solution_steps.append((
-					self.board.clone().grid,
-					CellState.QUEEN, 
-					f"Queen in the only unmarked {colour} cell"
-				))
+				self._record_step(CellState.QUEEN, f"Queen in the only unmarked {colour} cell", row, col)
+				self._flush_steps(Granularity.RULE)
 				self._mark_cells_around_queen(row, col)
 	
 	def _snapshot(self):
@@ -271,12 +386,14 @@ class BoardSolver:
 		Returns:
 			Board: A cloned version of the current board state.
 		"""
+		self._check_deadline()
 		return (
 			self.board.clone(),
 			{c: list(v) for c, v in self.unmarked_colour_dict.items()},
 			dict(self.colours_queen_dict),
 			{colour: (dict(r), dict(c)) for colour, (r, c) in self.colours_to_rc.items()},
-			[[[[cell.clone() for cell in row] for row in step[0]], step[1], step[2]] for step in self.solution_steps]
+			# Recorded grids are clones that are never modified, so they can be shared
+			list(self.solution_steps)
 		)
 
 	def _restore(self, snapshot):
@@ -292,6 +409,7 @@ class BoardSolver:
 		self.colours_queen_dict = queens
 		self.colours_to_rc = rc
 		self.solution_steps = steps
+		self._pending_step = None
 	
 	def _check_backtrack_queen_conflicts(self, row: int, col: int) -> bool:
 		"""
@@ -309,17 +427,28 @@ class BoardSolver:
 		Returns:
 			bool: True if marking the cell as a queen would cause a conflict, False otherwise.
 		"""
+		self.probes += 1
+		if self.budget.max_probes is not None and self.probes > self.budget.max_probes:
+			raise _BudgetHit(BudgetKind.PROBES)
+		if self.budget.max_depth is not None and self.depth >= self.budget.max_depth:
+			raise _BudgetHit(BudgetKind.DEPTH)
+
 		# Snapshot current state
 		snapshot = self._snapshot()
 
+		self.depth += 1
 		try:
 			# Attempt to proceed
 			self._mark_cell_as_queen(row, col)
-			self.solution_steps.append((
-				self.board.clone().grid,
-				CellState.QUEEN, 
-				f"Placing Queen on ({row}, {col}) and using backtracking to determine correct placement"
-			))
+			self._record_step(
+				CellState.QUEEN,
+				f"Placing Queen on ({row}, {col}) and using backtracking to determine correct placement",
+				row, col
+			)
+			self._flush_steps(Granularity.RULE)
+			# Rule out the probe queen's cells before anything else, so at queen
+			# granularity they share a step with its placement
+			self._mark_cells_around_queen(row, col)
 			self._check_steps()
 			# Check if a colour has no unmarked cells and has no queens
 			# If so, this is a conflict
@@ -330,12 +459,19 @@ class BoardSolver:
 			# Marking the cell as a queen would cause a conflict
 			self._restore(snapshot)
 			self._mark_cell_as_marked(row, col)
-			self.solution_steps.append((
-				self.board.clone().grid,
-				CellState.MARKED, 
-				f"Marked cell on ({row}, {col}) after determining it cannot be a Queen through backtracking"
-			))
+			self._record_step(
+				CellState.MARKED,
+				f"Marked cell on ({row}, {col}) after determining it cannot be a Queen through backtracking",
+				row, col
+			)
+			self._flush_steps()
 			return True
+		except _BudgetHit:
+			# Roll back the unfinished probe so only proven deductions remain
+			self._restore(snapshot)
+			raise
+		finally:
+			self.depth -= 1
 		return False
 	
 	def _check_cells_iterative_backtrack(self):
@@ -389,22 +525,27 @@ class BoardSolver:
 			for (r, c) in remaining_cells:
 				if axis == 0 and r in range(i, i + num_groups_checking):
 					self._mark_cell_as_marked(r, c)
-					self.solution_steps.append((
-						self.board.clone().grid,
-						CellState.MARKED, 
+					self._record_step(
+						CellState.MARKED,
 						f"Marked cell on ({r}, {c}) since there are too "\
 						+ f" many colours in the same row(s) as the "\
-						+ f"remaining cells of colour(s) {in_range}"
-					))
+						+ f"remaining cells of colour(s) {in_range}",
+						r, c,
+						f"Marked cells since there are too many colours in the "\
+						+ f"same row(s) as the remaining cells of colour(s) {in_range}"
+					)
 				elif axis == 1 and c in range(i, i + num_groups_checking):
 					self._mark_cell_as_marked(r, c)
-					self.solution_steps.append((
-						self.board.clone().grid,
-						CellState.MARKED, 
+					self._record_step(
+						CellState.MARKED,
 						f"Marked cell on ({r}, {c}) since there are too "\
 						+ f" many colours in the same column(s) as the "\
-						+ f"remaining cells of colour(s) {in_range}"
-					))
+						+ f"remaining cells of colour(s) {in_range}",
+						r, c,
+						f"Marked cells since there are too many colours in the "\
+						+ f"same column(s) as the remaining cells of colour(s) {in_range}"
+					)
+		self._flush_steps()
 	
 	def _compare_groups(self, axis: Axis):
 		sorted_colours = self._sort_by_least()
@@ -414,6 +555,7 @@ class BoardSolver:
 				in_range, not_in_range = self._compare_groups_helper(sorted_colours, axis, i, num_groups_checking)
 				if len(in_range) == num_groups_checking:
 					self._compare_groups_marking_helper(i, num_groups_checking, axis, in_range, not_in_range)
+				self._check_deadline()
 
 	def _check_steps(self):
 		"""
@@ -428,6 +570,7 @@ class BoardSolver:
 		"""
 		prev_state = None
 		while prev_state != self._hash_state():
+			self._check_deadline()
 			prev_state = self._hash_state()
 			self._check_queens()
 			self._check_single_colour()
@@ -438,6 +581,16 @@ class BoardSolver:
 			if prev_state == self._hash_state():
 				self._check_cells_iterative_backtrack()
 	
+	def _check_deadline(self):
+		"""
+		Stops the solve if its time budget has run out.
+
+		Raises:
+			_BudgetHit: If the deadline has passed.
+		"""
+		if self._deadline is not None and time.perf_counter() > self._deadline:
+			raise _BudgetHit(BudgetKind.TIME)
+
 	def _hash_state(self):
 		"""
 		Returns a tuple of tuples representing the state of the board.
@@ -451,7 +604,29 @@ class BoardSolver:
 		return tuple(tuple(cell.state for cell in row) for row in self.board.grid)
 	
 	def solve(self):
-		self._check_steps()
+		"""
+		Solves the board, recording every deduction as a step.
+
+		Returns:
+			list | None: The solution steps, or None if the board has no solution.
+
+		Raises:
+			BudgetExceeded: If a budget runs out first. It carries the steps
+				so far and the remaining candidate cells of each colour
+				without a queen.
+		"""
+		if self.budget.max_seconds is not None:
+			self._deadline = time.perf_counter() + self.budget.max_seconds
+		try:
+			self._check_steps()
+		except _BudgetHit as hit:
+			self._flush_steps()
+			remaining = {
+				colour: list(cells)
+				for colour, cells in self.unmarked_colour_dict.items()
+				if not self.colours_queen_dict[colour]
+			}
+			raise BudgetExceeded(hit.budget, self.solution_steps, remaining) from None
 
 		for _, has_queen in self.colours_queen_dict.items():
 			if not has_queen:
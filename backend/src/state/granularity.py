@@ -0,0 +1,14 @@
+from enum import Enum
+
+class Granularity(str, Enum):
+	"""
+	How finely BoardSolver records its deductions as steps.
+
+	CELL records one step per marked cell. RULE records one step per rule
+	application, such as all cells in a queen's row. QUEEN additionally folds
+	a queen placement and every cell it rules out into a single step, which
+	lists the ruled out cells as its cells and the placement as its queen.
+	"""
+	CELL = "cell"
+	RULE = "rule"
+	QUEEN = "queen"
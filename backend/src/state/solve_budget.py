@@ -0,0 +1,48 @@
+from enum import Enum
+from pydantic import BaseModel
+
+from src.state.board import Cell, CellState
+
+class BudgetKind(str, Enum):
+	TIME = "time"
+	PROBES = "probes"
+	DEPTH = "depth"
+
+class SolveBudget(BaseModel):
+	"""
+	Limits on the work a single solve may do. A limit of None is unbounded.
+
+	max_seconds bounds the wall time of the whole solve, max_probes the number
+	of backtracking probes (trial queen placements) and max_depth how deeply
+	probes may nest inside each other.
+
+	Each nested probe places a queen of another colour, so nesting is already
+	bounded by the number of colours. A max_depth below the board size cuts
+	off valid solves rather than only runaway ones.
+	"""
+	max_seconds: float | None = None
+	max_probes: int | None = None
+	max_depth: int | None = None
+
+class BudgetExceeded(Exception):
+	"""
+	Raised by BoardSolver.solve when a budget runs out before the board is solved.
+
+	Carries the partial result: every deduction made before the budget ran
+	out (with any unfinished probe rolled back) and the cells each colour
+	without a queen could still hold it.
+	"""
+	budget: BudgetKind
+	steps: list[tuple[list[list[Cell]], CellState, str, list[tuple[int, int]], tuple[int, int] | None]]
+	remaining: dict[str, list[tuple[int, int]]] # colour -> list(row, col)
+
+	def __init__(
+		self,
+		budget: BudgetKind,
+		steps: list[tuple[list[list[Cell]], CellState, str, list[tuple[int, int]], tuple[int, int] | None]],
+		remaining: dict[str, list[tuple[int, int]]]
+	) -> None:
+		super().__init__(f"Solve stopped after exceeding its {budget.value} budget")
+		self.budget = budget
+		self.steps = steps
+		self.remaining = remaining
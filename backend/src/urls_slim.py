@@ -0,0 +1,13 @@
+"""
+URL configuration for the solver-only profile (``src.settings_slim``).
+
+Only the Ninja API is mounted; the admin and CSRF cookie views of
+``src.urls`` depend on apps that profile does not install.
+"""
+
+from django.urls import path
+from .api import api
+
+urlpatterns = [
+	path("api/", api.urls),
+]
@@ -0,0 +1,22 @@
+"""
+Solver-only WSGI config for src project.
+
+Like ``src.wsgi`` but defaults to the ``src.settings_slim`` profile, which
+mounts only the Ninja API and CORS. Reports its import time and the time to
+its first response on stderr.
+"""
+
+import os
+import time
+
+_started = time.perf_counter()
+
+from django.core.wsgi import get_wsgi_application
+
+from src.startup import WsgiFirstResponseTimer, elapsed_ms, report
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'src.settings_slim')
+
+application = WsgiFirstResponseTimer(get_wsgi_application(), _started)
+
+report(f"src.wsgi_slim imported in {elapsed_ms(_started):.1f} ms")
@@ -1,11 +1,12 @@
 import { useMutation } from '@tanstack/react-query'
-import React, { useMemo, useState } from 'react'
-import { solve } from './api/board'
+import React, { useEffect, useMemo, useState } from 'react'
+import { StepsExpiredError, solve } from './api/board'
 import './App.css'
 import Cell from './components/Cell'
 import { useBoardContext } from './context/BoardContext'
+import type { CellContextType } from './context/BoardContext'
 import { useReplay } from './hooks/useReplay'
-import type { GridState } from './types/boardTypes'
+import type { SolveResponse } from './types/boardTypes'
 import { parseReplayMessage } from './utils/appUtils'
 
 const COLOURS = [
@@ -22,42 +23,54 @@ const COLOURS = [
 
 function App() {
 	const [changeColour, setChangeColour] = useState<string | null>(null)
-	const [steps, setSteps] = useState<GridState[]>([])
+	const [solution, setSolution] = useState<SolveResponse | null>(null)
 	const [solveError, setSolveError] = useState<string | null>(null)
 	const [isTransitioning, setIsTransitioning] = useState<boolean>(false)
 	const { rows, cols, cells, setRows, setCols, setCells } = useBoardContext()
 	const {
 		isReplaying,
 		currStepIndex,
+		currStep,
+		totalSteps,
+		stepsError,
 		startReplay,
 		pauseReplay,
 		cancelReplay,
 		setCurrStepIndex
-	} = useReplay(steps, setCells)
+	} = useReplay(solution, setCells)
 
-	const parsedSteps = useMemo(() => {
-		return steps.map(step => parseReplayMessage(step.message))
-	}, [steps])
+	const parsedStep = useMemo(() => {
+		return currStep ? parseReplayMessage(currStep.message) : null
+	}, [currStep])
 
 	const solveMutation = useMutation({
-		mutationFn: async () => await solve(rows, cols, cells),
+		mutationFn: async (grid: CellContextType[][]) => await solve(rows, cols, grid),
 		onSuccess: response => {
 			setChangeColour(null)
-			const lastStep = response.pop()
-			if (!lastStep) return
-			setCells(lastStep.grid)
-			response.push(lastStep)
-			setSteps(response)
+			if (!response.complete)
+				setSolveError(`The solver stopped early after exceeding its ${response.budget ?? ''} budget. Showing the deductions made so far.`)
+			if (response.steps === 0) return
+			setCells(response.grid)
+			setSolution(response)
 		},
 		onError: (error: Error) => {
 			setSolveError(error.message)
 		}
 	})
 
+	// Expired steps cannot be replayed, so put the board back as it was solved and let it be solved again
+	useEffect(() => {
+		if (!(stepsError instanceof StepsExpiredError)) return
+		cancelReplay()
+		setSolution(null)
+		if (solveMutation.variables) setCells(solveMutation.variables)
+		setSolveError(stepsError.message)
+	}, [stepsError, cancelReplay, solveMutation.variables, setCells])
+
 	const handleDecrement = (arrangement: 'row' | 'col') => {
 		if (arrangement === 'row' && rows <= 4) return
 		if (arrangement === 'col' && cols <= 4) return
-		setSteps([])
+		setSolution(null)
 		setCurrStepIndex(-1)
 		if (arrangement === 'row')
 			setRows(rows - 1)
@@ -68,7 +81,7 @@ function App() {
 	const handleIncrement = (arrangement: 'row' | 'col') => {
 		if (arrangement === 'row' && rows >= 9) return
 		if (arrangement === 'col' && cols >= 9) return
-		setSteps([])
+		setSolution(null)
 		setCurrStepIndex(-1)
 		if (arrangement === 'row')
 			setRows(rows + 1)
@@ -91,7 +104,7 @@ function App() {
 			)
 		)
 		cancelReplay()
-		setSteps([])
+		setSolution(null)
 		setSolveError(null)
 	}
 
@@ -101,7 +114,7 @@ function App() {
 			cells.map(row => row.map(cell => ({ ...cell, state: 'empty' })))
 		)
 		cancelReplay()
-		setSteps([])
+		setSolution(null)
 	}
 
 	const handleReplay = () => {
@@ -116,13 +129,14 @@ function App() {
 
 	const handleSolve = () => {
 		setSolveError(null)
-		solveMutation.mutate()
+		solveMutation.mutate(cells)
 	}
 
 	const replayStepMessage = () => {
-		if (currStepIndex >= steps.length) return 'Done!'
+		if (currStepIndex >= totalSteps) return 'Done!'
+		if (!parsedStep) return 'Loading step...'
 
-		const { message, colours } = parsedSteps[currStepIndex]
+		const { message, colours } = parsedStep
 
 		return (
 			<span className='replay-message'>
@@ -182,6 +196,7 @@ function App() {
 				</button>
 			</div>
 			{solveError && <p className='error-message'>{solveError}</p>}
+			{stepsError && <p className='error-message'>{stepsError.message}</p>}
 			<div
 				className='grid-container grid'
 				style={
@@ -225,7 +240,7 @@ function App() {
 					className='solve-button'
 					type='button'
 					onClick={handleSolve}
-					disabled={solveMutation.isPending || steps.length > 0}
+					disabled={solveMutation.isPending || totalSteps > 0}
 				>
 					{solveMutation.isPending ? 'Solving...' : 'Solve'}
 				</button>
@@ -234,7 +249,7 @@ function App() {
 						Crunching the board — this may take a moment...
 					</p>
 				)}
-				{steps.length > 0 && (
+				{totalSteps > 0 && (
 					<button
 						className='replay-button'
 						type='button'
@@ -244,7 +259,7 @@ function App() {
 						{(currStepIndex >= 0 ? 'Restart ' : '') + 'Replay'}
 					</button>
 				)}
-				{currStepIndex >= 0 && currStepIndex < steps.length && (
+				{currStepIndex >= 0 && currStepIndex < totalSteps && (
 					<button
 						className='pause-replay-button'
 						type='button'
@@ -253,7 +268,7 @@ function App() {
 						{isReplaying ? 'Pause Replay' : 'Resume Replay'}
 					</button>
 				)}
-				{currStepIndex >= 0 && currStepIndex < steps.length && (
+				{currStepIndex >= 0 && currStepIndex < totalSteps && (
 					<button
 						className='cancel-replay-button'
 						type='button'
@@ -1,15 +1,23 @@
 import type { CellContextType } from '../context/BoardContext'
-import type { SolveResponse } from '../types/boardTypes'
+import type { Granularity, GridState, SolveResponse } from '../types/boardTypes'
 
 const apiURL = import.meta.env.VITE_API_URL as string | undefined ?? 'http://localhost:8000'
 
-export async function solve(rows: number, cols: number, grid: CellContextType[][]): Promise<SolveResponse> {
+// Thrown when the server no longer has a solve's steps and the board must be solved again
+export class StepsExpiredError extends Error {}
+
+export async function solve(
+	rows: number,
+	cols: number,
+	grid: CellContextType[][],
+	granularity: Granularity = 'rule'
+): Promise<SolveResponse> {
 	const response = await fetch(`${apiURL}/api/solve`, {
 		method: 'POST',
 		headers: {
 			'Content-Type': 'application/json'
 		},
-		body: JSON.stringify({ rows, cols, grid })
+		body: JSON.stringify({ rows, cols, grid, granularity })
 	})
 	if (!response.ok) {
 		const error = await response.json() as { detail?: string }
@@ -17,3 +25,13 @@ export async function solve(rows: number, cols: number, grid: CellContextType[][
 	}
 	return response.json() as Promise<SolveResponse>
 }
+
+export async function fetchSteps(id: string, from: number, to: number): Promise<GridState[]> {
+	const response = await fetch(`${apiURL}/api/solve/${id}/steps?from=${from}&to=${to}`)
+	if (!response.ok) {
+		const error = await response.json() as { detail?: string }
+		const message = error.detail ?? 'Failed to load the solution steps'
+		throw response.status === 410 ? new StepsExpiredError(message) : new Error(message)
+	}
+	return response.json() as Promise<GridState[]>
+}
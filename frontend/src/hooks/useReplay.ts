@@ -1,25 +1,56 @@
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { useCallback, useEffect, useState } from 'react'
-import type { GridState } from '../types/boardTypes'
+import { StepsExpiredError, fetchSteps } from '../api/board'
+import type { GridState, SolveResponse } from '../types/boardTypes'
 
-export function useReplay(steps: GridState[], setCells: (grid: GridState['grid']) => void) {
+const STEPS_PAGE_SIZE = 20
+
+function stepsPageQuery(id: string, page: number) {
+	const from = page * STEPS_PAGE_SIZE
+	return {
+		queryKey: ['solveSteps', id, page],
+		queryFn: async () => await fetchSteps(id, from, from + STEPS_PAGE_SIZE),
+		staleTime: Infinity,
+		retry: (failureCount: number, error: Error) => !(error instanceof StepsExpiredError) && failureCount < 3
+	}
+}
+
+export function useReplay(solution: SolveResponse | null, setCells: (grid: GridState['grid']) => void) {
+	const queryClient = useQueryClient()
 	const [isReplaying, setIsReplaying] = useState<boolean>(false)
 	const [currStepIndex, setCurrStepIndex] = useState<number>(-1)
+	const totalSteps = solution?.steps ?? 0
+	const page = Math.floor(Math.max(currStepIndex, 0) / STEPS_PAGE_SIZE)
+
+	const stepsQuery = useQuery({
+		...stepsPageQuery(solution?.id ?? '', page),
+		enabled: solution !== null && currStepIndex >= 0 && currStepIndex < totalSteps
+	})
+
+	const currStep: GridState | undefined = stepsQuery.data?.[currStepIndex % STEPS_PAGE_SIZE]
+
+	useEffect(() => {
+		if (!solution || currStepIndex < 0) return
+		if ((page + 1) * STEPS_PAGE_SIZE >= solution.steps) return
+		void queryClient.prefetchQuery(stepsPageQuery(solution.id, page + 1))
+	}, [solution, currStepIndex, page, queryClient])
 
 	useEffect(() => {
 		if (!isReplaying) return
-		if (currStepIndex >= steps.length) {
+		if (currStepIndex >= totalSteps) {
 			setIsReplaying(false)
 			return
 		}
+		if (!currStep) return
 
-		setCells(steps[currStepIndex].grid)
+		setCells(currStep.grid)
 
 		const timeout = setTimeout(() => {
 			setCurrStepIndex(i => i + 1)
 		}, 1000)
 
 		return () => clearTimeout(timeout)
-	}, [isReplaying, currStepIndex, steps, setCells])
+	}, [isReplaying, currStepIndex, totalSteps, currStep, setCells])
 
 	const startReplay = useCallback(() => {
 		setIsReplaying(false)
@@ -42,6 +73,9 @@ export function useReplay(steps: GridState[], setCells: (grid: GridState['grid']
 	return {
 		isReplaying,
 		currStepIndex,
+		currStep,
+		totalSteps,
+		stepsError: stepsQuery.error,
 		startReplay,
 		pauseReplay,
 		cancelReplay,
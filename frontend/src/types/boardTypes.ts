@@ -2,10 +2,23 @@ import type { CellContextType } from '../context/BoardContext'
 
 export type CellState = 'empty' | 'queen' | 'marked'
 
+export type Granularity = 'cell' | 'rule' | 'queen'
+
 export type GridState = {
 	grid: CellContextType[][]
 	state: CellState
 	message: string
+	cells: [number, number][]
+	queen: [number, number] | null
 }
 
-export type SolveResponse = GridState[]
+export type SolveBudgetKind = 'time' | 'probes' | 'depth'
+
+export type SolveResponse = {
+	id: string
+	steps: number
+	grid: CellContextType[][]
+	complete: boolean
+	budget: SolveBudgetKind | null
+	remaining: Record<string, [number, number][]>
+}